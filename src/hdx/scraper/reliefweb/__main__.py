@@ -60,10 +60,12 @@ def main(
                 retriever=retriever,
                 temp_dir=temp_dir,
             )
-            disaster_list = reliefweb.scrape_data()
-
             logger.info("Creating dataset")
-            dataset = reliefweb.generate_dataset(disaster_list=disaster_list)
+            dataset = reliefweb.generate_dataset(
+                disasters=reliefweb.iter_disasters()
+            )
+            if dataset is None:
+                return
             dataset.update_from_yaml(
                 path=join(
                     dirname(__file__), "config", "hdx_dataset_static.yaml"
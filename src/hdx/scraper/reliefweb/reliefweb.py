@@ -1,6 +1,9 @@
 import logging
-from typing import List, Optional
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
 from slugify import slugify
 
 from hdx.api.configuration import Configuration
@@ -9,14 +12,63 @@ from hdx.utilities.retriever import Retrieve
 
 logger = logging.getLogger(__name__)
 
+_LIST_SEPARATOR = ", "
+_join_list = _LIST_SEPARATOR.join
+
+# Returned by _find_path when there is no value at a path
+_MISSING = object()
+
 
 class ReliefWeb:
+    __slots__ = (
+        "_configuration",
+        "_retriever",
+        "_temp_dir",
+        "_tags",
+        "_hxl_tags",
+        "_data_url",
+        "_output_columns",
+    )
+
     _APP_NAME = "vocabulary"
+    _DATA_URL_TEMPLATE = (
+        "{base_url}?appname={app_name}&preset={preset}&limit={limit}{fields}"
+    )
     _DATE_FIELD = "date-event"
+    # Fields requested from the API when no output columns are configured.
+    # Otherwise only the fields that the output columns read are requested.
+    _FIELDS = (
+        "id",
+        "name",
+        "description",
+        "status",
+        "glide",
+        "primary_country",
+        "primary_type",
+        "country",
+        "type",
+        "url",
+        "url_alias",
+        "date",
+        "current",
+        "description-html",
+    )
     _FILENAME = "reliefweb-disasters-list.csv"
     _LIMIT = 1000
     _LOCATION = "world"
     _PRESET = "external"
+    # Flattened keys that are not necessary to the dataset. The primary
+    # flags of the country and type lists cannot be excluded from the API
+    # request, the others are only returned if the requested fields change.
+    _SKIP_KEYS = frozenset(
+        {
+            "uuid",
+            "type-primary",
+            "country-primary",
+            "profile-overview",
+            "profile-overview-html",
+        }
+    )
 
     def __init__(
         self, configuration: Configuration, retriever: Retrieve, temp_dir: str
@@ -24,80 +76,94 @@ class ReliefWeb:
         self._configuration = configuration
         self._retriever = retriever
         self._temp_dir = temp_dir
-        self._tags = self._create_tags()
-        self._hxl_tags = self._create_hxl_tags()
+        self._tags = configuration["fixed_tags"]
+        self._hxl_tags = configuration["hxl_tags"]
+        self._output_columns = _create_output_columns(
+            configuration.get("output_columns")
+        )
+        if self._output_columns:
+            fields = tuple(
+                dict.fromkeys(path[0] for _, path in self._output_columns)
+            )
+        else:
+            fields = self._FIELDS
+        self._data_url = self._DATA_URL_TEMPLATE.format(
+            base_url=configuration["base_url"],
+            app_name=self._APP_NAME,
+            preset=self._PRESET,
+            limit=self._LIMIT,
+            fields="".join(f"&fields[include][]={f}" for f in fields),
+        )
 
-    def scrape_data(self) -> list:
+    def iter_disasters(self) -> Iterator[dict]:
         """
-        Query the API and store the results in a list.
+        Query the API and yield the flattened fields of each disaster.
 
-        The result for a single row will have the following format:
+        The fields needed for each disaster are requested in the list query,
+        so the API is paged through rather than fetching every disaster
+        individually. The result for a single row will have the following
+        format:
         {
-            "id": "52108",
+            "id": "25466",
             "score": 1,
             "fields": {
-                "id": 52108,
-                "name": "Chad: Floods - Aug 2024",
-                "status": "ongoing",
-                "glide": "FL-2024-000139-TCD"
+                "id": 25466,
+                "name": "Burkina Faso: Floods - Aug 2015",
+                "description": "On the first week of August 2015, ...",
+                "status": "past",
+                "glide": "FL-2015-000106-BFA",
+                "primary_country": {...},
+                "primary_type": {...},
+                "country": [...],
+                "type": [...],
+                ...
             },
-            "href": "https://api.reliefweb.int/v1/disasters/52108"
+            "href": "https://api.reliefweb.int/v1/disasters/25466"
         }
         """
         logger.info("Scraping data")
-        data_url = f"{self._configuration["base_url"]}?appname={self._APP_NAME}&preset={self._PRESET}&limit={self._LIMIT}"
-        data = self._retriever.download_json(data_url)
-        disaster_list = data["data"]
-
-        disasters_list = []
-        for disaster in disaster_list:
-            disaster_url = disaster["href"]
-
-            disaster_data = None
-            try:
-                disaster_data = self._retriever.download_json(disaster_url)
-            except Exception as e:
-                if "404" in str(e):
-                    logger.info(
-                        f"404 error for {disaster['fields']['name']}: {e}"
-                    )
-                else:
-                    logger.error(
-                        f"Error downloading data for {disaster['fields']['name']}: {e}"
+        offset = 0
+        total_count = 1
+        while offset < total_count:
+            data_url = f"{self._data_url}&offset={offset}"
+            data = orjson.loads(
+                self._retriever.download_text(
+                    data_url, filename=f"disasters-offset-{offset}.json"
+                )
+            )
+            total_count = data["totalCount"]
+
+            for disaster in data["data"]:
+                if self._output_columns:
+                    yield _project_data(
+                        disaster["fields"], self._output_columns
                     )
-                continue
-
-            if not disaster_data:
-                logger.info(f"No data for {disaster['fields']['name']}")
-                continue
-
-            flat_data = _format_data(disaster_data)
-            disaster_fields = flat_data["data"][0]["fields"]
-
-            # Remove items from the dictionary that are not necessary to the dataset
-            remove_keys = [
-                "uuid",
-                "type-primary",
-                "country-primary",
-                "profile-overview",
-                "profile-overview-html",
-            ]
-            for key in remove_keys:
-                disaster_fields.pop(key, None)
+                    continue
 
-            disasters_list.append(disaster_fields)
+                # Without configured output columns, fall back to flattening
+                # whatever fields were returned
+                yield _flatten_data(
+                    disaster["fields"], skip_keys=self._SKIP_KEYS
+                )
 
-        return disasters_list
+            offset += self._LIMIT
 
-    def generate_dataset(self, disaster_list: list) -> Optional[Dataset]:
+    def generate_dataset(self, disasters: Iterable[dict]) -> Optional[Dataset]:
         """
-        Generate the dataset
+        Generate the dataset. The headers are taken from the first disaster
+        and the disasters are written to the resource as they are iterated.
         """
+        disasters = iter(disasters)
+        first_disaster = next(disasters, None)
+        if first_disaster is None:
+            logger.warning("No disasters found")
+            return None
+
         # Setup the dataset information
         title = "ReliefWeb Disasters List"
         slugified_name = slugify("ReliefWeb Disasters List")
 
-        logger.info(f"Creating dataset: {title}")
+        logger.info("Creating dataset: %s", title)
 
         dataset = Dataset(
             {
@@ -115,8 +181,8 @@ class ReliefWeb:
         }
 
         dataset.generate_resource_from_iterable(
-            list(disaster_list[0].keys()),
-            disaster_list,
+            list(first_disaster.keys()),
+            chain((first_disaster,), disasters),
             self._hxl_tags,
             self._temp_dir,
             self._FILENAME,
@@ -127,28 +193,83 @@ class ReliefWeb:
 
         return dataset
 
-    def _create_tags(self) -> List[str]:
-        logger.info("Generating tags")
-        tags = self._configuration["fixed_tags"]
-        return tags
 
-    def _create_hxl_tags(self) -> List[str]:
-        logger.info("Generating hxl tags")
-        hxl_tags = self._configuration["hxl_tags"]
-        return hxl_tags
+def _create_output_columns(
+    output_columns: Optional[Dict[str, List[str]]],
+) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """
+    Convert the output_columns configuration, which maps each column name
+    to the path of keys to follow into the disaster fields, into a tuple
+    of (column, path) pairs that can be projected without further lookups.
+    """
+    if not output_columns:
+        return ()
+    return tuple(
+        (column, tuple(path)) for column, path in output_columns.items()
+    )
+
+
+def _project_data(
+    data: dict, output_columns: Tuple[Tuple[str, Tuple[str, ...]], ...]
+) -> dict:
+    """
+    Build a row with only the configured output columns, reading each one
+    directly from its path in the data rather than flattening every field.
+    """
+    return {column: _get_path(data, path) for column, path in output_columns}
 
 
-def _format_data(data: dict) -> dict:
+def _get_path(data: Any, path: Tuple[str, ...]) -> Any:
     """
-    Takes a dictionary and flattens any nested dictionaries or lists,
-    stringing together the keys.
+    Follow the path of keys into the data. Where a list is met on the way,
+    the path is followed into each of its items and the values found are
+    joined into a comma-separated string. As in _flatten_data, items
+    without the path are left out while None values are kept (as "None").
+    Returns None if nothing is found at the path.
     """
-    for d in data["data"]:
-        d["fields"] = _flatten_data(d.pop("fields"))
-    return data
+    value = _find_path(data, path)
+    if value is _MISSING:
+        return None
+    return value
+
+
+def _find_path(data: Any, path: Tuple[str, ...]) -> Any:
+    """
+    Follow the path of keys into the data for _get_path, returning _MISSING
+    rather than None if nothing is found at the path.
+    """
+    value = data
+    for position, key in enumerate(path):
+        value_type = type(value)
+        if value_type is list:
+            remaining_path = path[position:]
+            value = [
+                item_value
+                for item_value in (
+                    _find_path(item, remaining_path) for item in value
+                )
+                if item_value is not _MISSING
+            ]
+            break
+        if value_type is not dict:
+            return _MISSING
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+
+    if type(value) is list:
+        if not value:
+            return _MISSING
+        try:
+            return _join_list(value)
+        except TypeError:
+            return _join_list(map(str, value))
+    return value
 
 
-def _flatten_data(data, sep: str = "-") -> dict:
+def _flatten_data(
+    data, sep: str = "-", skip_keys: frozenset = frozenset()
+) -> dict:
     """
     The data contains fields with nested dictionaries and lists, where a
     sample field could contain a format like this:
@@ -181,40 +302,53 @@ def _flatten_data(data, sep: str = "-") -> dict:
         "type-name": "Flash Flood, Flood",
         "type-code": "FF, FL"
     }
+    Any flattened key in skip_keys is left out, without walking its value.
     """
     flat_dict = {}
+    _sep = sep
+    # The parsed JSON only contains plain dicts and lists, so compare types
+    # directly against local names rather than using isinstance
+    _dict = dict
+    _list = list
 
-    def _flatten_inner(item, parent_key=""):
-        if isinstance(item, dict):
+    # Walk the data with an explicit stack rather than recursing. Children
+    # are pushed in reverse so that they are popped, and so added to the
+    # result, in their original order.
+    stack = [(data, "")]
+    while stack:
+        item, parent_key = stack.pop()
+        item_type = type(item)
+        if item_type is _dict:
             # Flatten nested dictionary
-            for key, value in item.items():
-                new_key = f"{parent_key}{sep}{key}" if parent_key else key
-                _flatten_inner(value, new_key)
-        elif isinstance(item, list):
+            for key, value in reversed(item.items()):
+                new_key = f"{parent_key}{_sep}{key}" if parent_key else key
+                if new_key not in skip_keys:
+                    stack.append((value, new_key))
+        elif item_type is _list:
             # Flatten nested list that may also contain nested dictionaries
-            list_items = {}
+            list_items = defaultdict(list)
+            key_root = f"{parent_key}{_sep}"
+            item_skip_keys = frozenset(
+                k[len(key_root) :] for k in skip_keys if k.startswith(key_root)
+            )
             for value in item:
-                if isinstance(value, dict):
-                    flattened_dict = {}
-                    _flatten_inner(value, parent_key)
-                    for k, v in flat_dict.items():
-                        key_root = f"{parent_key}{sep}"
-                        if k.startswith(key_root):
-                            flattened_dict[k[len(key_root) :]] = v
-                    for k, v in flattened_dict.items():
-                        if k not in list_items:
-                            list_items[k] = []
+                if type(value) is _dict:
+                    for k, v in _flatten_data(
+                        value, _sep, item_skip_keys
+                    ).items():
                         list_items[k].append(v)
                 else:
-                    if parent_key not in list_items:
-                        list_items[parent_key] = []
-                    list_items[parent_key].append(str(value))
+                    list_items[parent_key].append(value)
 
-            # Flatten collected list items into comma-separated strings
+            # Flatten collected list items into comma-separated strings,
+            # only converting the values when they are not all strings
             for k, v in list_items.items():
-                flat_dict[f"{parent_key}{sep}{k}"] = ", ".join(map(str, v))
+                try:
+                    joined = _join_list(v)
+                except TypeError:
+                    joined = _join_list(map(str, v))
+                flat_dict[f"{key_root}{k}"] = joined
         else:
             flat_dict[parent_key] = item
 
-    _flatten_inner(data)
     return flat_dict
@@ -5,7 +5,11 @@ import pytest
 from freezegun import freeze_time
 
 from hdx.api.configuration import Configuration
-from hdx.scraper.reliefweb.reliefweb import ReliefWeb
+from hdx.scraper.reliefweb.reliefweb import (
+    ReliefWeb,
+    _flatten_data,
+    _get_path,
+)
 from hdx.utilities.compare import assert_files_same
 from hdx.utilities.downloader import Download
 from hdx.utilities.path import temp_dir
@@ -138,7 +142,7 @@ class TestReliefWeb:
                     temp_dir=tempdir,
                 )
 
-                disaster_list = reliefweb.scrape_data()
+                disaster_list = list(reliefweb.iter_disasters())
 
                 assert list(disaster_list[0].keys()) == [
                     "id",
@@ -171,12 +175,11 @@ class TestReliefWeb:
                     "date-changed",
                     "date-created",
                     "date-event",
+                    "current",
                     "description-html",
                 ]
 
-                dataset = reliefweb.generate_dataset(
-                    disaster_list=disaster_list
-                )
+                dataset = reliefweb.generate_dataset(disasters=disaster_list)
                 dataset.update_from_yaml(
                     path=join(config_dir, "hdx_dataset_static.yaml")
                 )
@@ -192,3 +195,178 @@ class TestReliefWeb:
                         join("tests", "fixtures", filename),
                         join(tempdir, filename),
                     )
+
+    def test_reliefweb_no_disasters(self, configuration, input_dir):
+        with temp_dir(
+            "TestReliefWebNoDisasters",
+            delete_on_success=True,
+            delete_on_failure=False,
+        ) as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader=downloader,
+                    fallback_dir=tempdir,
+                    saved_dir=join(input_dir, "empty"),
+                    temp_dir=tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+
+                reliefweb = ReliefWeb(
+                    configuration=configuration,
+                    retriever=retriever,
+                    temp_dir=tempdir,
+                )
+
+                dataset = reliefweb.generate_dataset(
+                    disasters=reliefweb.iter_disasters()
+                )
+                assert dataset is None
+
+    def test_reliefweb_without_output_columns(self, configuration, input_dir):
+        with temp_dir(
+            "TestReliefWebWithoutOutputColumns",
+            delete_on_success=True,
+            delete_on_failure=False,
+        ) as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader=downloader,
+                    fallback_dir=tempdir,
+                    saved_dir=input_dir,
+                    temp_dir=tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+
+                reliefweb = ReliefWeb(
+                    configuration=configuration,
+                    retriever=retriever,
+                    temp_dir=tempdir,
+                )
+                fallback_configuration = {
+                    key: value
+                    for key, value in configuration.items()
+                    if key != "output_columns"
+                }
+                fallback_reliefweb = ReliefWeb(
+                    configuration=fallback_configuration,
+                    retriever=retriever,
+                    temp_dir=tempdir,
+                )
+                assert fallback_reliefweb._data_url == reliefweb._data_url
+
+                # Flattening leaves out the fields a disaster does not have,
+                # where the projection sets them to None
+                projected_rows = [
+                    [
+                        (key, value)
+                        for key, value in row.items()
+                        if value is not None
+                    ]
+                    for row in reliefweb.iter_disasters()
+                ]
+                flattened_rows = [
+                    list(row.items())
+                    for row in fallback_reliefweb.iter_disasters()
+                ]
+                assert flattened_rows == projected_rows
+
+    def test_reliefweb_pages(self, configuration, input_dir, mocker):
+        mocker.patch.object(ReliefWeb, "_LIMIT", 1)
+        with temp_dir(
+            "TestReliefWebPages",
+            delete_on_success=True,
+            delete_on_failure=False,
+        ) as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader=downloader,
+                    fallback_dir=tempdir,
+                    saved_dir=join(input_dir, "paged"),
+                    temp_dir=tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+                download_text = mocker.spy(retriever, "download_text")
+
+                reliefweb = ReliefWeb(
+                    configuration=configuration,
+                    retriever=retriever,
+                    temp_dir=tempdir,
+                )
+
+                disaster_list = list(reliefweb.iter_disasters())
+                assert [disaster["id"] for disaster in disaster_list] == [
+                    25466,
+                    25846,
+                ]
+                assert [
+                    call.kwargs["filename"]
+                    for call in download_text.call_args_list
+                ] == ["disasters-offset-0.json", "disasters-offset-1.json"]
+
+    def test_flatten_data(self):
+        data = {
+            "id": 25466,
+            "uuid": "9b380090-74a6-4086-9864-3497a185e0d6",
+            "name": "Burkina Faso: Floods - Aug 2015",
+            "primary_type": {"id": 4611, "name": "Flood", "code": "FL"},
+            "country": [
+                {
+                    "id": 46,
+                    "iso3": "bfa",
+                    "location": {"lat": 12.27, "lon": -1.74},
+                    "primary": True,
+                },
+                {
+                    "id": 229,
+                    "iso3": "mkd",
+                    "location": {"lat": None, "lon": 21.7},
+                },
+            ],
+            "type": [
+                {"id": 4624, "name": "Flash Flood", "code": "FF"},
+                {"id": 4611, "name": "Flood", "code": "FL", "primary": True},
+            ],
+            "langcode": ["en", 2, None],
+            "profile": {
+                "overview": "Overview",
+                "overview-html": "<p>Overview</p>",
+            },
+            "date": {"event": "2015-08-07T00:00:00+00:00"},
+        }
+        flat_data = _flatten_data(data, skip_keys=ReliefWeb._SKIP_KEYS)
+        assert list(flat_data.items()) == [
+            ("id", 25466),
+            ("name", "Burkina Faso: Floods - Aug 2015"),
+            ("primary_type-id", 4611),
+            ("primary_type-name", "Flood"),
+            ("primary_type-code", "FL"),
+            ("country-id", "46, 229"),
+            ("country-iso3", "bfa, mkd"),
+            ("country-location-lat", "12.27, None"),
+            ("country-location-lon", "-1.74, 21.7"),
+            ("type-id", "4624, 4611"),
+            ("type-name", "Flash Flood, Flood"),
+            ("type-code", "FF, FL"),
+            ("langcode-langcode", "en, 2, None"),
+            ("date-event", "2015-08-07T00:00:00+00:00"),
+        ]
+
+    def test_get_path(self):
+        data = {
+            "country": [
+                {"location": [{"lat": 1.5}, {"lat": 2}]},
+                {"location": [{"lat": None}]},
+                {"name": "Chad"},
+            ],
+            "type": [],
+        }
+        assert (
+            _get_path(data, ("country", "location", "lat")) == "1.5, 2, None"
+        )
+        assert _get_path(data, ("country", "name")) == "Chad"
+        assert _get_path(data, ("country", "iso3")) is None
+        assert _get_path(data, ("type", "id")) is None
+        assert _get_path(data, ("primary_country", "iso3")) is None